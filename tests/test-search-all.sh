@@ -0,0 +1,53 @@
+#!/bin/bash
+
+# Checks that git search-all -j keeps every output line intact, matches
+# the serial output, and exits like grep. Run from anywhere: tests/test-search-all.sh
+
+SCRIPT="$(cd "$(dirname "$0")/.." && pwd)/git-search-all"
+
+fail() { echo "FAIL: $*" >&2; exit 1; }
+
+REPO=`mktemp -d` || exit 1
+trap 'rm -rf "$REPO"' EXIT
+cd "$REPO" || exit 1
+git init -q .
+git config user.name test
+git config user.email test@example.com
+
+# Long lines and many commits, so stdio buffers fill mid-line.
+PAD=`printf '%0300d' 0 | tr 0 x`
+for i in `seq -w 300`; do
+    echo "needle line $i $PAD" >> f.txt
+    git add f.txt
+    git commit -q -m "commit $i"
+done
+
+"$SCRIPT" needle > serial.out || fail "serial run exited $?"
+"$SCRIPT" -j 8 needle > parallel.out || fail "parallel run exited $?"
+
+EXPECTED=$((300 * 301 / 2))
+[ `wc -l < parallel.out` -eq $EXPECTED ] || fail "wrong line count"
+BAD=`grep -cvE "^[0-9a-f]{40}:f\.txt:needle line [0-9]{3} $PAD\$" parallel.out`
+[ "$BAD" -eq 0 ] || fail "$BAD malformed lines under -j"
+cmp -s serial.out parallel.out || fail "parallel output differs from serial"
+
+# Only the newest commits contain line 250, so most batches miss.
+"$SCRIPT" -j 4 needle.line.250 > /dev/null
+[ $? -eq 0 ] || fail "-j with a partial match did not exit 0"
+"$SCRIPT" -j 4 nomatch > /dev/null
+[ $? -ne 0 ] || fail "-j with no match exited 0"
+"$SCRIPT" -j 4 --no-such-option needle > /dev/null 2>&1
+STATUS=$?
+[ $STATUS -ge 2 ] || fail "-j with a git grep error exited $STATUS"
+
+# Early batches are printed before the rest are searched, so a reader
+# that stops early also stops the search.
+FIRST=`"$SCRIPT" -j 2 needle | head -n 1`
+[ "$FIRST" = "`head -n 1 serial.out`" ] || fail "wrong first line under -j"
+
+for bad in "-j needle" "-j abc needle" "-j" "-j0 needle" "--jobs= needle"; do
+    "$SCRIPT" $bad > /dev/null 2>&1
+    [ $? -eq 2 ] || fail "'$bad' was not rejected"
+done
+
+echo "ok"